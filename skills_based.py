@@ -2,33 +2,42 @@ import math
 import random
 import os
 import json
+import sys
 import matplotlib
+# Select Agg before pyplot is imported so no GUI backend is resolved at import;
+# the Tk backend is only loaded when a scene is actually shown (see
+# display_and_save_scene).
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.patches import Ellipse
+from matplotlib.collections import LineCollection, EllipseCollection
+import numpy as np
 import bisect
 import uuid 
 import csv
 import base64
 from io import BytesIO
+from itertools import count
 
 
-# We disable interactive mode and enforce a specific backend for consistency.
+# We disable interactive mode; scenes are rendered off-screen.
 plt.ioff()
-matplotlib.use("TkAgg", force=True)
 
 ##############################################################################
 # ID Generator
 ##############################################################################
 class UniqueIDGenerator:
+    # One itertools.count per alias; next() hands out 0, 1, 2, ...
     counters = {}
 
     @staticmethod
     def get_unique_id(alias):
-        if alias not in UniqueIDGenerator.counters:
-            UniqueIDGenerator.counters[alias] = 0
-        this_id = UniqueIDGenerator.counters[alias]
-        UniqueIDGenerator.counters[alias] += 1
-        return this_id
+        counter = UniqueIDGenerator.counters.get(alias)
+        if counter is None:
+            counter = UniqueIDGenerator.counters[alias] = count()
+        return next(counter)
 
     @staticmethod
     def reset_counters():
@@ -74,21 +83,61 @@ class PlotObject:
     def __init__(self):
         self.obj_id = UniqueIDGenerator.get_unique_id(self.ALIAS)
         self.sub_references = []
-
+        # The id never changes, so the "Alias#id" tag and the recognition line
+        # are built once here instead of in every collect_skills call.
+        self._tag = f"{self.ALIAS}#{self.obj_id}"
+        self._recognize_skill = f"RecognizeInstance{self.ALIAS} => {self._tag}"
+
+    # Assign geometry to the whole subtree in one flat pre-order walk rather than
+    # recursing through every subclass. Subclasses only implement
+    # _assign_self_only for their own attributes.
     def assign_geometry(self):
-        for child in self.sub_references:
-            child.assign_geometry()
+        for node in self.iter_subtree():
+            node._assign_self_only()
+
+    def _assign_self_only(self):
+        # To be overridden by subclasses.
+        pass
+
+    # Yield this object and its descendants in pre-order. Children are read only
+    # after their parent has been yielded, so children created while the parent
+    # is processed (e.g. axis ticks) are still visited.
+    def iter_subtree(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.sub_references))
+
+    # Run the skill trace for this subtree and return it as one string. Lines are
+    # gathered into a single buffer and written at most once.
+    def perform_skills(self, verbose=False):
+        buf = []
+        self.collect_skills(buf)
+        result = "\n".join(buf)
+        if verbose:
+            sys.stdout.write(result + "\n")
+        return result
 
-    def perform_skills(self):
+    # Append this subtree's skill lines to buf.
+    def collect_skills(self, buf):
         for child in self.sub_references:
-            child.perform_skills()
+            child.collect_skills(buf)
 
+    # Draw this subtree onto ax. Composite shapes are drawn the same way as a
+    # whole scene: one LineCollection plus one EllipseCollection.
     def render(self, ax):
+        draw_scene(ax, SceneBuffer.from_scene([self]))
+
+    # Append (p1, p2) for every line segment in this subtree to segs and
+    # (cx, cy, width, height, angle) for every oval to ovals, so the whole scene
+    # can be drawn as one LineCollection plus one EllipseCollection.
+    def collect_primitives(self, segs, ovals):
         for child in self.sub_references:
-            child.render(ax)
+            child.collect_primitives(segs, ovals)
 
     def __repr__(self):
-        return f"{self.ALIAS}#{self.obj_id}"
+        return self._tag
 
     def set_bottom_left(self, x, y, angle=0, **kwargs):
         # To be overridden by subclasses.
@@ -117,17 +166,26 @@ class PlotObject:
         return data
 
     # Recursively apply an affine transformation function to all coordinate attributes.
+    # Positions may come in as lists (e.g. from a JSON plan); they are stored
+    # back as tuples.
     def apply_transformation(self, func):
-        for attr in ['p1', 'p2', 'center', 'base_position']:
-            if hasattr(self, attr):
-                value = getattr(self, attr)
-                if value is not None and isinstance(value, tuple) and len(value) == 2:
-                    setattr(self, attr, func(value))
+        for attr in ['p1', 'p2', 'center', 'base_position', 'start_position']:
+            value = getattr(self, attr, None)
+            if isinstance(value, (tuple, list)) and len(value) == 2:
+                setattr(self, attr, func(tuple(value)))
         if hasattr(self, 'vertices') and self.vertices is not None:
             self.vertices = [func(v) if v is not None else None for v in self.vertices]
         for child in self.sub_references:
             child.apply_transformation(func)
 
+    # Move the already assigned geometry of this subtree so that anchor lands on
+    # target. Used when set_bottom_left only changes an object's position, so
+    # its sampled shape is kept instead of being re-generated.
+    def _translate_subtree(self, anchor, target):
+        dx = target[0] - anchor[0]
+        dy = target[1] - anchor[1]
+        self.apply_transformation(lambda p: (p[0] + dx, p[1] + dy))
+
     # Return a bounding box (min_x, min_y, max_x, max_y).
     def get_bbox(self):
         if hasattr(self, 'p1') and hasattr(self, 'p2'):
@@ -173,7 +231,7 @@ class LineLow(PlotObject):
             self.p1 = (0, 0)
             self.p2 = (0, 0)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             length = random.uniform(10, 30)
             angle = random.uniform(0, 360)
@@ -183,28 +241,28 @@ class LineLow(PlotObject):
             dy = (length / 2) * math.sin(math.radians(angle))
             self.p1 = (cx - dx, cy - dy)
             self.p2 = (cx + dx, cy + dy)
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
-        messages.append(f"RecognizeInstanceLine => Line#{self.obj_id}")
-        messages.append(f"LocalizeLine => Line#{self.obj_id} (Endpoints: {self.p1}, {self.p2})")
+    def collect_skills(self, buf):
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeLine => {self._tag} (Endpoints: {self.p1}, {self.p2})")
         length, angle = get_line_length_and_angle(self.p1, self.p2)
-        messages.append(f"MeasureLine => Line#{self.obj_id} (Length={length:.1f}, Angle={angle:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+        buf.append(f"MeasureLine => {self._tag} (Length={length:.1f}, Angle={angle:.1f})")
 
     def render(self, ax):
         ax.plot([self.p1[0], self.p2[0]],
                 [self.p1[1], self.p2[1]],
                 color='k', lw=2)
 
+    def collect_primitives(self, segs, ovals):
+        segs.append((self.p1, self.p2))
+
     def set_bottom_left(self, x, y, angle=0, length=10, **kwargs):
-        rad = math.radians(angle)
         self.p1 = (x, y)
-        self.p2 = (x + length * math.cos(rad), y + length * math.sin(rad))
+        if angle == 0:
+            self.p2 = (x + length, y)
+        else:
+            rad = math.radians(angle)
+            self.p2 = (x + length * math.cos(rad), y + length * math.sin(rad))
         self._geometry_locked = True
 
     def get_bbox(self):
@@ -233,7 +291,7 @@ class OvalLow(PlotObject):
             self.height = 10
             self.angle = 0
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             cx = random.uniform(20, 80)
             cy = random.uniform(20, 80)
@@ -244,18 +302,12 @@ class OvalLow(PlotObject):
             self.width = w
             self.height = h
             self.angle = ang
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
-        messages.append(f"RecognizeInstanceOval => Oval#{self.obj_id}")
-        messages.append(f"LocalizeOval => Oval#{self.obj_id} (Center={self.center}, W={self.width}, H={self.height}, Angle={self.angle:.1f})")
+    def collect_skills(self, buf):
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeOval => {self._tag} (Center={self.center}, W={self.width}, H={self.height}, Angle={self.angle:.1f})")
         area = math.pi * (self.width / 2.0) * (self.height / 2.0)
-        messages.append(f"MeasureOval => Oval#{self.obj_id} (Area={area:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+        buf.append(f"MeasureOval => {self._tag} (Area={area:.1f})")
 
     def render(self, ax):
         e = Ellipse(xy=self.center,
@@ -267,13 +319,20 @@ class OvalLow(PlotObject):
                     lw=2)
         ax.add_patch(e)
 
+    def collect_primitives(self, segs, ovals):
+        ovals.append((self.center[0], self.center[1], self.width, self.height, self.angle))
+
     def set_bottom_left(self, x, y, angle=0, width=10, height=10, **kwargs):
-        rad = math.radians(angle)
         offset_x = width / 2.0
         offset_y = height / 2.0
-        rotated_cx = x + offset_x * math.cos(rad) - offset_y * math.sin(rad)
-        rotated_cy = y + offset_x * math.sin(rad) + offset_y * math.cos(rad)
-        self.center = (rotated_cx, rotated_cy)
+        if angle == 0:
+            self.center = (x + offset_x, y + offset_y)
+        else:
+            rad = math.radians(angle)
+            c, s = math.cos(rad), math.sin(rad)
+            rotated_cx = x + offset_x * c - offset_y * s
+            rotated_cy = y + offset_x * s + offset_y * c
+            self.center = (rotated_cx, rotated_cy)
         self.width = width
         self.height = height
         self.angle = angle
@@ -289,12 +348,18 @@ class OvalLow(PlotObject):
 # Rectangle (with 4 lines)
 ##############################################################################
 def rotate_point(pt, center, ang_deg):
-    r = math.radians(ang_deg)
+    rad = math.radians(ang_deg)
+    c, s = math.cos(rad), math.sin(rad)
+    return rotate_point_cs(pt, center, c, s)
+
+# Same as rotate_point but with a precomputed (cos, sin) pair, for loops that
+# rotate many points by the same angle.
+def rotate_point_cs(pt, center, c, s):
     (x, y) = pt
     (cx, cy) = center
     dx, dy = x - cx, y - cy
-    rx = cx + dx * math.cos(r) - dy * math.sin(r)
-    ry = cy + dx * math.sin(r) + dy * math.cos(r)
+    rx = cx + dx * c - dy * s
+    ry = cy + dx * s + dy * c
     return (rx, ry)
 
 class RectangleObj(PlotObject):
@@ -313,69 +378,81 @@ class RectangleObj(PlotObject):
             self.width = 0
             self.height = 0
             self.angle = 0
+        # (cos, sin) of _cs_angle when set_bottom_left was given it, e.g. by
+        # BarsObj, which places every bar at the same angle. Only used while
+        # self.angle still equals _cs_angle.
+        self._cs = None
+        self._cs_angle = None
         for _ in range(4):
             line = LineLow()
             self.sub_references.append(line)
+        self._lines = tuple(self.sub_references)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             self.center = (random.uniform(30, 70), random.uniform(30, 70))
             self.width = random.uniform(10, 30)
             self.height = random.uniform(10, 30)
             self.angle = random.uniform(0, 180)
+            self._cs = None
         half_w = self.width / 2.0
         half_h = self.height / 2.0
-        corners = [
-            (self.center[0] - half_w, self.center[1] - half_h),
-            (self.center[0] + half_w, self.center[1] - half_h),
-            (self.center[0] + half_w, self.center[1] + half_h),
-            (self.center[0] - half_w, self.center[1] + half_h),
-        ]
+        cx, cy = self.center
+        corners = [(cx - half_w, cy - half_h), (cx + half_w, cy - half_h),
+                   (cx + half_w, cy + half_h), (cx - half_w, cy + half_h)]
         if self.angle != 0:
-            corners = [rotate_point(c, self.center, self.angle) for c in corners]
-        lines = [ln for ln in self.sub_references if isinstance(ln, LineLow)]
-        if len(lines) == 4:
-            for i in range(4):
-                lines[i].p1 = corners[i]
-                lines[i].p2 = corners[(i + 1) % 4]
-                lines[i]._geometry_locked = True
-        super().assign_geometry()
-
-    def perform_skills(self, verbose=False):
-        messages = []
+            # One (cos, sin) pair rotates all four corners.
+            if self._cs is not None and self._cs_angle == self.angle:
+                c, s = self._cs
+            else:
+                rad = math.radians(self.angle)
+                c, s = math.cos(rad), math.sin(rad)
+            corners = [rotate_point_cs(pt, self.center, c, s) for pt in corners]
+        # _lines always holds the four edges, so no length check is needed.
+        for ln, p1, p2 in zip(self._lines, corners, corners[1:] + corners[:1]):
+            ln.p1 = p1
+            ln.p2 = p2
+            ln._geometry_locked = True
+
+    def collect_skills(self, buf):
         # Collect output from sub-references
         for sub in self.sub_references:
-            messages.append(sub.perform_skills(verbose=verbose))
-        line_ids = [sub.obj_id for sub in self.sub_references if isinstance(sub, LineLow)]
+            sub.collect_skills(buf)
+        line_ids = [ln.obj_id for ln in self._lines]
         if line_ids:
-            messages.append(f"GroupLine => Rectangle#{self.obj_id} from lineIDs={line_ids}")
-        messages.append(f"RecognizeInstanceRectangle => Rectangle#{self.obj_id}")
-        messages.append(f"LocalizeRectangle => Rectangle#{self.obj_id} (W={self.width:.1f}, H={self.height:.1f}, Angle={self.angle:.1f})")
+            buf.append(f"GroupLine => {self._tag} from lineIDs={line_ids}")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeRectangle => {self._tag} (W={self.width:.1f}, H={self.height:.1f}, Angle={self.angle:.1f})")
         area = self.width * self.height
         perimeter = 2.0 * (self.width + self.height)
-        messages.append(f"MeasureRectangle => Rectangle#{self.obj_id} (Area={area:.1f}, Perimeter={perimeter:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
-    def render(self, ax):
-        for sub in self.sub_references:
-            sub.render(ax)
+        buf.append(f"MeasureRectangle => {self._tag} (Area={area:.1f}, Perimeter={perimeter:.1f})")
 
-    def set_bottom_left(self, x, y, angle=0, width=10, height=10, **kwargs):
+    # cs may carry a precomputed (cos, sin) of angle; it is kept for
+    # _assign_self_only so the corners do not need the trig again.
+    def set_bottom_left(self, x, y, angle=0, width=10, height=10, cs=None, **kwargs):
         self.width = width
         self.height = height
         self.angle = angle
-        rad = math.radians(angle)
         offset_x = width / 2.0
         offset_y = height / 2.0
-        rotated_cx = x + offset_x * math.cos(rad) - offset_y * math.sin(rad)
-        rotated_cy = y + offset_x * math.sin(rad) + offset_y * math.cos(rad)
-        self.center = (rotated_cx, rotated_cy)
+        if angle == 0:
+            # Unrotated (the default for bars and bar graphs): no trig needed.
+            self.center = (x + offset_x, y + offset_y)
+            self._cs = None
+        else:
+            if cs is None:
+                rad = math.radians(angle)
+                cs = (math.cos(rad), math.sin(rad))
+            c, s = cs
+            self._cs = (c, s)
+            self._cs_angle = angle
+            rotated_cx = x + offset_x * c - offset_y * s
+            rotated_cy = y + offset_x * s + offset_y * c
+            self.center = (rotated_cx, rotated_cy)
         self._geometry_locked = True
 
     def get_bbox(self):
-        bboxes = [line.get_bbox() for line in self.sub_references if isinstance(line, LineLow)]
+        bboxes = [ln.get_bbox() for ln in self._lines]
         if bboxes:
             min_x = min(b[0] for b in bboxes)
             min_y = min(b[1] for b in bboxes)
@@ -402,44 +479,35 @@ class TriangleObj(PlotObject):
         for _ in range(3):
             line = LineLow()
             self.sub_references.append(line)
+        self._lines = tuple(self.sub_references)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             x1, y1 = random.uniform(20, 80), random.uniform(20, 80)
             x2, y2 = x1 + random.uniform(10, 30), y1 + random.uniform(-20, 20)
             x3, y3 = x1 + random.uniform(-20, 20), y1 + random.uniform(10, 30)
             self.vertices = [(x1, y1), (x2, y2), (x3, y3)]
-        lines = [ln for ln in self.sub_references if isinstance(ln, LineLow)]
-        if len(lines) == 3:
-            for i in range(3):
-                lines[i].p1 = self.vertices[i]
-                lines[i].p2 = self.vertices[(i + 1) % 3]
-                lines[i]._geometry_locked = True
-        super().assign_geometry()
+        verts = self.vertices
+        for ln, p1, p2 in zip(self._lines, verts, verts[1:] + verts[:1]):
+            ln.p1 = p1
+            ln.p2 = p2
+            ln._geometry_locked = True
 
-    def perform_skills(self, verbose=False):
-        messages = []
+    def collect_skills(self, buf):
         # Collect output from sub-references
         for sub in self.sub_references:
-            messages.append(sub.perform_skills(verbose=verbose))
-        line_ids = [line.obj_id for line in self.sub_references if isinstance(line, LineLow)]
+            sub.collect_skills(buf)
+        line_ids = [ln.obj_id for ln in self._lines]
         if line_ids:
-            messages.append(f"GroupLine => Triangle#{self.obj_id} from lineIDs={line_ids}")
-        messages.append(f"RecognizeInstanceTriangle => Triangle#{self.obj_id}")
-        messages.append(f"LocalizeTriangle => Triangle#{self.obj_id} (Vertices={self.vertices})")
+            buf.append(f"GroupLine => {self._tag} from lineIDs={line_ids}")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeTriangle => {self._tag} (Vertices={self.vertices})")
         x1, y1 = self.vertices[0]
         x2, y2 = self.vertices[1]
         x3, y3 = self.vertices[2]
         area = abs(x1*(y2-y3) + x2*(y3-y1) + x3*(y1-y2)) / 2.0
-        messages.append(f"MeasureTriangle => Triangle#{self.obj_id} (Area={area:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+        buf.append(f"MeasureTriangle => {self._tag} (Area={area:.1f})")
 
-    def render(self, ax):
-        for sub in self.sub_references:
-            sub.render(ax)
 
     def set_bottom_left(self, x, y, **kwargs):
         dx = kwargs.get("dx", 10)
@@ -479,8 +547,9 @@ class PolygonObj(PlotObject):
         for _ in range(10):
             line = LineLow()
             self.sub_references.append(line)
+        self._lines = tuple(self.sub_references)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             self.center = (random.uniform(30, 70), random.uniform(30, 70))
             self.sides = random.randint(3, 6)
@@ -493,7 +562,7 @@ class PolygonObj(PlotObject):
             px = self.center[0] + self.radius * math.cos(theta)
             py = self.center[1] + self.radius * math.sin(theta)
             corners.append((px, py))
-        lines = [ln for ln in self.sub_references if isinstance(ln, LineLow)]
+        lines = self._lines
         if len(lines) >= self.sides:
             for i in range(self.sides):
                 lines[i].p1 = corners[i]
@@ -503,30 +572,23 @@ class PolygonObj(PlotObject):
                 lines[j].p1 = (0, 0)
                 lines[j].p2 = (0, 0)
                 lines[j]._geometry_locked = True
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
+    def collect_skills(self, buf):
         # Get the lines used in the polygon (limit to self.sides)
-        used_lines = [ln for ln in self.sub_references[:self.sides] if isinstance(ln, LineLow)]
+        used_lines = self._lines[:self.sides]
         for ln in used_lines:
-            messages.append(ln.perform_skills(verbose=verbose))
+            ln.collect_skills(buf)
         line_ids = [ln.obj_id for ln in used_lines]
         if line_ids:
-            messages.append(f"GroupLine => Polygon#{self.obj_id} from lineIDs={line_ids}")
-        messages.append(f"RecognizeInstancePolygon => Polygon#{self.obj_id}")
-        messages.append(f"LocalizePolygon => Polygon#{self.obj_id} (Sides={self.sides}, Angle={self.angle:.1f})")
+            buf.append(f"GroupLine => {self._tag} from lineIDs={line_ids}")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizePolygon => {self._tag} (Sides={self.sides}, Angle={self.angle:.1f})")
         area = 0.5 * self.sides * (self.radius ** 2) * math.sin(2 * math.pi / self.sides)
-        messages.append(f"MeasurePolygon => Polygon#{self.obj_id} (Area={area:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
-    def render(self, ax):
-        line_count = self.sides
-        used_lines = self.sub_references[:line_count]
-        for sub in used_lines:
-            sub.render(ax)
+        buf.append(f"MeasurePolygon => {self._tag} (Area={area:.1f})")
+
+    def collect_primitives(self, segs, ovals):
+        for ln in self._lines[:self.sides]:
+            ln.collect_primitives(segs, ovals)
 
     def set_bottom_left(self, x, y, angle=0, sides=3, radius=10, **kwargs):
         self.sides = sides
@@ -566,8 +628,9 @@ class ArrowObj(PlotObject):
         for _ in range(3):
             line = LineLow()
             self.sub_references.append(line)
+        self._lines = tuple(self.sub_references)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
         if not hasattr(self, "_geometry_locked") or not self._geometry_locked:
             self.start = (random.uniform(20, 30), random.uniform(20, 30))
             self.length = random.uniform(20, 40)
@@ -576,7 +639,7 @@ class ArrowObj(PlotObject):
         x1, y1 = self.start
         x2 = x1 + self.length * math.cos(rad)
         y2 = y1 + self.length * math.sin(rad)
-        lines = [ln for ln in self.sub_references if isinstance(ln, LineLow)]
+        lines = self._lines
         if len(lines) == 3:
             lines[0].p1 = (x1, y1)
             lines[0].p2 = (x2, y2)
@@ -595,31 +658,22 @@ class ArrowObj(PlotObject):
             lines[2].p1 = (x2, y2)
             lines[2].p2 = (rx, ry)
             lines[2]._geometry_locked = True
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
+    def collect_skills(self, buf):
         # Process all sub-references first.
         for sub in self.sub_references:
-            messages.append(sub.perform_skills(verbose=verbose))
-        line_ids = [ln.obj_id for ln in self.sub_references if isinstance(ln, LineLow)]
+            sub.collect_skills(buf)
+        line_ids = [ln.obj_id for ln in self._lines]
         if line_ids:
-            messages.append(f"GroupLine => Arrow#{self.obj_id} from lineIDs={line_ids}")
-        messages.append(f"RecognizeInstanceArrow => Arrow#{self.obj_id}")
-        messages.append(f"LocalizeArrow => Arrow#{self.obj_id} (Length={self.length:.1f}, Angle={self.angle:.1f})")
-        messages.append(f"MeasureArrow => Arrow#{self.obj_id} (ShaftLength={self.length:.1f})")
+            buf.append(f"GroupLine => {self._tag} from lineIDs={line_ids}")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeArrow => {self._tag} (Length={self.length:.1f}, Angle={self.angle:.1f})")
+        buf.append(f"MeasureArrow => {self._tag} (ShaftLength={self.length:.1f})")
         rad = math.radians(self.angle)
         dx = math.cos(rad)
         dy = math.sin(rad)
-        messages.append(f"ArrowDirection => Arrow#{self.obj_id} (Vector=({dx:.2f}, {dy:.2f}))")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+        buf.append(f"ArrowDirection => {self._tag} (Vector=({dx:.2f}, {dy:.2f}))")
 
-    def render(self, ax):
-        for sub in self.sub_references:
-            sub.render(ax)
 
     def set_bottom_left(self, x, y, angle=0, length=20, **kwargs):
         self.start = (x, y)
@@ -628,7 +682,7 @@ class ArrowObj(PlotObject):
         self._geometry_locked = True
 
     def get_bbox(self):
-        bboxes = [ln.get_bbox() for ln in self.sub_references if isinstance(ln, LineLow)]
+        bboxes = [ln.get_bbox() for ln in self._lines]
         if bboxes:
             min_x = min(b[0] for b in bboxes)
             min_y = min(b[1] for b in bboxes)
@@ -662,57 +716,62 @@ class BarsObj(PlotObject):
         self.max_height = max_height
         self.base_position = base_position
         self._geometry_locked = False
+        # Pending new base position for a move that keeps the bar shapes.
+        self._move_to = None
         self.bars_list = []
         for _ in range(self.num_bars):
             rect = RectangleObj()
             self.bars_list.append(rect)
             self.sub_references.append(rect)
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
+        if self._move_to is not None:
+            self._translate_subtree(self.base_position, self._move_to)
+            self._move_to = None
         if not self._geometry_locked:
             if self.base_position is not None:
                 base_x, base_y = self.base_position
             else:
                 base_x = random.uniform(10, 30)
                 base_y = random.uniform(50, 80)
-            angle_rad = math.radians(self.angle)
-            delta_x = (self.max_width + self.spacing) * math.cos(angle_rad)
-            delta_y = (self.max_width + self.spacing) * math.sin(angle_rad)
+            rad = math.radians(self.angle)
+            c, s = math.cos(rad), math.sin(rad)
+            delta_x = (self.max_width + self.spacing) * c
+            delta_y = (self.max_width + self.spacing) * s
             current_x = base_x
             current_y = base_y
+            # The same RectangleObj (and LineLow edges) are re-placed on every
+            # regeneration; set_bottom_left sets the size and angle as well.
+            cs = (c, s)
             for rect in self.bars_list:
-                rect.width = random.uniform(self.min_width, self.max_width)
-                rect.height = random.uniform(self.min_height, self.max_height)
-                rect.angle = self.angle
-                rect.set_bottom_left(current_x, current_y, angle=self.angle, width=rect.width, height=rect.height)
+                width = random.uniform(self.min_width, self.max_width)
+                height = random.uniform(self.min_height, self.max_height)
+                rect.set_bottom_left(current_x, current_y, angle=self.angle, width=width, height=height, cs=cs)
                 current_x += delta_x
                 current_y += delta_y
             self._geometry_locked = True
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
+    def collect_skills(self, buf):
         for sub in self.sub_references:
-            messages.append(sub.perform_skills(verbose=verbose))
-        rect_ids = [sub.obj_id for sub in self.sub_references if isinstance(sub, RectangleObj)]
+            sub.collect_skills(buf)
+        rect_ids = [rect.obj_id for rect in self.bars_list]
         if rect_ids:
-            messages.append(f"GroupRectangle => Bars#{self.obj_id} from rectangleIDs={rect_ids}")
-        messages.append(f"RecognizeInstanceBars => Bars#{self.obj_id}")
-        messages.append(f"LocalizeBars => Bars#{self.obj_id} (Positions for each rectangle)")
-        messages.append(f"MeasureBars => Bars#{self.obj_id} (Heights, widths, spacing, etc.)")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+            buf.append(f"GroupRectangle => {self._tag} from rectangleIDs={rect_ids}")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeBars => {self._tag} (Positions for each rectangle)")
+        buf.append(f"MeasureBars => {self._tag} (Heights, widths, spacing, etc.)")
 
-    def render(self, ax):
-        for sub in self.sub_references:
-            sub.render(ax)
 
     def set_bottom_left(self, x, y, angle=0, **kwargs):
+        if self._geometry_locked and self.base_position is not None and angle == self.angle:
+            # Only the position changed: shift the existing bars on the next
+            # assign rather than re-sampling their sizes.
+            self._move_to = (x, y)
+            return
         self.base_position = (x, y)
         self.angle = angle
         self._geometry_locked = False
+        self._move_to = None
 
     def get_bbox(self):
         bboxes = [obj.get_bbox() for obj in self.bars_list]
@@ -737,10 +796,14 @@ class AxisObj(PlotObject):
                  max_tick_spacing=10,
                  min_tick_length=2,
                  max_tick_length=4,
-                 start_position=None):
+                 start_position=None,
+                 direction=None):
         super().__init__()
         self.axis_length = axis_length
         self.axis_angle = axis_angle
+        # Optional precomputed (cos, sin) of axis_angle, e.g. from BarGraphObj,
+        # which derives both of its axes from one pair.
+        self._direction = direction
         self.min_tick_spacing = min_tick_spacing
         self.max_tick_spacing = max_tick_spacing
         self.min_tick_length = min_tick_length
@@ -752,17 +815,26 @@ class AxisObj(PlotObject):
         self.p1 = (0, 0)
         self.p2 = (0, 0)
         self._geometry_locked = False
+        # Pending new start point for a move that keeps the sampled ticks.
+        self._move_to = None
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
+        if self._move_to is not None:
+            self._translate_subtree(self.p1, self._move_to)
+            self._move_to = None
         if not self._geometry_locked:
             if self.start_position is not None:
                 x1, y1 = self.start_position
             else:
                 x1 = random.uniform(10, 20)
                 y1 = random.uniform(60, 80)
-            rad = math.radians(self.axis_angle)
-            dx = self.axis_length * math.cos(rad)
-            dy = self.axis_length * math.sin(rad)
+            if self._direction is not None:
+                c, s = self._direction
+            else:
+                rad = math.radians(self.axis_angle)
+                c, s = math.cos(rad), math.sin(rad)
+            dx = self.axis_length * c
+            dy = self.axis_length * s
             x2 = x1 + dx
             y2 = y1 + dy
             self.p1 = (x1, y1)
@@ -770,54 +842,57 @@ class AxisObj(PlotObject):
             self.line.p1 = self.p1
             self.line.p2 = self.p2
             self.line._geometry_locked = True
+            # Drop the ticks of any previous assignment before adding new ones.
+            self.ticks = []
+            del self.sub_references[1:]
             tick_start = 0.0
             while tick_start < self.axis_length:
                 spacing = random.uniform(self.min_tick_spacing, self.max_tick_spacing)
                 if tick_start + spacing > self.axis_length:
                     break
                 tick_start += spacing
-                cx = x1 + tick_start * math.cos(rad)
-                cy = y1 + tick_start * math.sin(rad)
-                tick_len = random.uniform(self.min_tick_length, self.max_tick_length)
-                half_t = tick_len / 2.0
-                rx = half_t * math.cos(rad + math.pi/2)
-                ry = half_t * math.sin(rad + math.pi/2)
+                cx = x1 + tick_start * c
+                cy = y1 + tick_start * s
+                half_t = random.uniform(self.min_tick_length, self.max_tick_length) / 2.0
+                # Ticks are perpendicular: cos(a + 90) = -sin(a), sin(a + 90) = cos(a).
+                rx = -half_t * s
+                ry = half_t * c
                 tick_line = LineLow((cx - rx, cy - ry), (cx + rx, cy + ry))
                 self.ticks.append(tick_line)
                 self.sub_references.append(tick_line)
             self._geometry_locked = True
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
-        messages.append(self.line.perform_skills(verbose=verbose))
+    def collect_skills(self, buf):
+        self.line.collect_skills(buf)
         for tline in self.ticks:
-            messages.append(tline.perform_skills(verbose=verbose))
+            tline.collect_skills(buf)
         group_line_msg = (
-            f"GroupLine => Axis#{self.obj_id} from lineIDs=[{self.line.obj_id}"
+            f"GroupLine => {self._tag} from lineIDs=[{self.line.obj_id}"
             + "".join(f", {t.obj_id}" for t in self.ticks)
             + "]"
         )
-        messages.append(group_line_msg)
-        messages.append(f"RecognizeInstanceAxis => Axis#{self.obj_id}")
-        messages.append(f"LocalizeAxis => Axis#{self.obj_id} (Endpoints={self.p1}, {self.p2})")
+        buf.append(group_line_msg)
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeAxis => {self._tag} (Endpoints={self.p1}, {self.p2})")
         length, angle = get_line_length_and_angle(self.p1, self.p2)
-        messages.append(f"MeasureAxis => Axis#{self.obj_id} (Length={length:.1f}, Angle={angle:.1f})")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
-
-    def render(self, ax):
-        self.line.render(ax)
-        for tline in self.ticks:
-            tline.render(ax)
+        buf.append(f"MeasureAxis => {self._tag} (Length={length:.1f}, Angle={angle:.1f})")
 
     def set_bottom_left(self, x, y, angle=0, axis_length=50, **kwargs):
+        if (self._geometry_locked and angle == self.axis_angle
+                and axis_length == self.axis_length):
+            # Keep the sampled ticks; they (and start_position) are shifted on
+            # the next assign. A random start is pinned to p1 first so the move
+            # survives a later regeneration.
+            if self.start_position is None:
+                self.start_position = self.p1
+            self._move_to = (x, y)
+            return
         self.start_position = (x, y)
         self.axis_angle = angle
         self.axis_length = axis_length
+        self._direction = None
         self._geometry_locked = False
+        self._move_to = None
 
     def get_bbox(self):
         return (min(self.p1[0], self.p2[0]),
@@ -855,71 +930,82 @@ class BarGraphObj(PlotObject):
         self.with_y_axis = with_y_axis
         self.axis_margin = axis_margin
         self._geometry_locked = False
+        # Pending new base position for a move that keeps bars and axes as is.
+        self._move_to = None
         self.bars_obj = BarsObj(num_bars=self.bars_num,
                                 angle=self.bars_angle,
                                 base_position=self.base_position,
                                 **kwargs)
         self.sub_references.append(self.bars_obj)
-        rad_offset = math.radians(self.bars_angle - 90)
-        ax_start_x = self.base_position[0] + self.axis_margin * math.cos(rad_offset)
-        ax_start_y = self.base_position[1] + self.axis_margin * math.sin(rad_offset)
+        # One (cos, sin) pair serves both axes and the margin offset:
+        # cos(a - 90) = sin(a), sin(a - 90) = -cos(a), and the y axis at a + 90
+        # points along (-sin(a), cos(a)).
+        rad = math.radians(self.bars_angle)
+        c, s = math.cos(rad), math.sin(rad)
+        ax_start_x = self.base_position[0] + self.axis_margin * s
+        ax_start_y = self.base_position[1] - self.axis_margin * c
         self.axis_obj_x = AxisObj(start_position=(ax_start_x, ax_start_y),
                                   axis_length=self.axis_length,
-                                  axis_angle=self.bars_angle)
+                                  axis_angle=self.bars_angle,
+                                  direction=(c, s))
         self.sub_references.append(self.axis_obj_x)
         if self.with_y_axis:
+            # bars_angle is normally in [0, 360), so a single subtraction wraps it.
+            y_angle = self.bars_angle + 90
+            if y_angle >= 360:
+                y_angle -= 360
             self.axis_obj_y = AxisObj(start_position=(ax_start_x, ax_start_y),
                                       axis_length=self.axis_length,
-                                      axis_angle=((self.bars_angle + 90) % 360))
+                                      axis_angle=y_angle,
+                                      direction=(-s, c))
             self.sub_references.append(self.axis_obj_y)
         else:
             self.axis_obj_y = None
 
-    def assign_geometry(self):
+    def _assign_self_only(self):
+        if self._move_to is not None:
+            # Runs before the children in the subtree walk, so the whole graph
+            # is shifted here and the (still locked) children keep their shape.
+            self._translate_subtree(self.base_position, self._move_to)
+            self._move_to = None
+        # Unlock the children so the subtree walk re-generates them.
         if not self._geometry_locked:
             self.bars_obj._geometry_locked = False
             self.axis_obj_x._geometry_locked = False
             if self.axis_obj_y:
                 self.axis_obj_y._geometry_locked = False
-            self.axis_obj_x.assign_geometry()
-            if self.axis_obj_y:
-                self.axis_obj_y.assign_geometry()
-            self.bars_obj.assign_geometry()
             self._geometry_locked = True
-        super().assign_geometry()
 
-    def perform_skills(self, verbose=False):
-        messages = []
-        messages.append(self.axis_obj_x.perform_skills(verbose=verbose))
+    def collect_skills(self, buf):
+        self.axis_obj_x.collect_skills(buf)
         if self.axis_obj_y:
-            messages.append(self.axis_obj_y.perform_skills(verbose=verbose))
-            messages.append(
-                f"GroupAxis => BarGraph#{self.obj_id} from AxisIDs=[{self.axis_obj_x.obj_id}, {self.axis_obj_y.obj_id}]"
+            self.axis_obj_y.collect_skills(buf)
+            buf.append(
+                f"GroupAxis => {self._tag} from AxisIDs=[{self.axis_obj_x.obj_id}, {self.axis_obj_y.obj_id}]"
             )
         else:
-            messages.append(
-                f"GroupAxis => BarGraph#{self.obj_id} from AxisIDs=[{self.axis_obj_x.obj_id}]"
+            buf.append(
+                f"GroupAxis => {self._tag} from AxisIDs=[{self.axis_obj_x.obj_id}]"
             )
-        messages.append(self.bars_obj.perform_skills(verbose=verbose))
-        messages.append(f"GroupBars => BarGraph#{self.obj_id} from BarsIDs=[{self.bars_obj.obj_id}]")
-        messages.append(f"RecognizeInstanceBarGraph => BarGraph#{self.obj_id}")
-        messages.append(f"LocalizeBarGraph => BarGraph#{self.obj_id} (Overall bounding region, etc.)")
-        messages.append(f"MeasureBarGraph => BarGraph#{self.obj_id} (Number of bars, axis length, etc.)")
-        result = "\n".join(messages)
-        if verbose:
-            print(result)
-        return result
+        self.bars_obj.collect_skills(buf)
+        buf.append(f"GroupBars => {self._tag} from BarsIDs=[{self.bars_obj.obj_id}]")
+        buf.append(self._recognize_skill)
+        buf.append(f"LocalizeBarGraph => {self._tag} (Overall bounding region, etc.)")
+        buf.append(f"MeasureBarGraph => {self._tag} (Number of bars, axis length, etc.)")
 
-    def render(self, ax):
-        for sub in self.sub_references:
-            sub.render(ax)
 
     def set_bottom_left(self, x, y, angle=0, axis_length=50, bars_num=2, **kwargs):
+        if (self._geometry_locked and angle == self.bars_angle
+                and axis_length == self.axis_length and bars_num == self.bars_num):
+            # Only the position changed: translate instead of re-sampling.
+            self._move_to = (x, y)
+            return
         self.base_position = (x, y)
         self.bars_angle = angle
         self.axis_length = axis_length
         self.bars_num = bars_num
         self._geometry_locked = False
+        self._move_to = None
 
     def get_bbox(self):
         bboxes = []
@@ -1023,9 +1109,10 @@ def create_scene(plan, avoid_types=None, canvas=(0,100,0,100), allow_partial=Tru
     for obj in scene:
         obj.assign_geometry()
 
-    skill_output = ""
+    skill_lines = []
     for obj in scene:
-        skill_output += "\n" + obj.perform_skills()
+        obj.collect_skills(skill_lines)
+    skill_output = "".join("\n" + line for line in skill_lines)
 
     if not allow_partial:
         adjust_scene(scene, canvas=canvas)
@@ -1035,61 +1122,151 @@ def create_scene(plan, avoid_types=None, canvas=(0,100,0,100), allow_partial=Tru
 # New Function: Display Scene and Save Structure
 ##############################################################################
 
+# Figure/Axes reused by every off-screen render; clearing an Axes is much
+# cheaper than building a new Figure for each scene. The shared figure is
+# attached straight to an Agg canvas rather than created through pyplot, so it
+# is never registered with the pyplot figure manager.
+_FIG, _AX = None, None
+
+def get_scene_axes(canvas, reuse=True):
+    global _FIG, _AX
+    if not reuse:
+        fig, ax = plt.subplots(figsize=(5, 5))
+    else:
+        if _FIG is None:
+            _FIG = Figure(figsize=(5, 5))
+            FigureCanvasAgg(_FIG)
+            _AX = _FIG.add_subplot()
+        else:
+            _AX.cla()
+        fig, ax = _FIG, _AX
+    setup_scene_axes(ax, canvas)
+    return fig, ax
+
+# Limits, orientation and decorations shared by every scene render.
+def setup_scene_axes(ax, canvas):
+    x_min, x_max, y_min, y_max = canvas
+    ax.set_xlim(x_min, x_max)
+    # Reversed limits flip y (image coordinates) in one call.
+    ax.set_ylim(y_max, y_min)
+    ax.set_aspect("equal")
+    ax.set_axis_off()
+
+# Render payload for one scene, stored as parallel arrays (one per field)
+# rather than a list of objects: segments is (N, 2, 2), the oval fields are
+# length-M columns, and noise is (K, 2) pixel positions. Everything the
+# collections need is a contiguous slice.
+class SceneBuffer:
+    def __init__(self, segments, ovals, noise=None):
+        self.segments = np.asarray(segments, dtype=np.float32).reshape(-1, 2, 2)
+        ovals = np.asarray(ovals, dtype=np.float64).reshape(-1, 5)
+        self.oval_centers = np.ascontiguousarray(ovals[:, :2])
+        self.oval_widths = np.ascontiguousarray(ovals[:, 2])
+        self.oval_heights = np.ascontiguousarray(ovals[:, 3])
+        self.oval_angles = np.ascontiguousarray(ovals[:, 4])
+        if noise is None:
+            noise = np.empty((0, 2), dtype=np.int64)
+        self.noise = noise
+
+    # Flatten the primitives of every object in the scene into a buffer.
+    @classmethod
+    def from_scene(cls, scene, noise=None):
+        segs = []
+        ovals = []
+        for obj in scene:
+            obj.collect_primitives(segs, ovals)
+        return cls(segs, ovals, noise)
+
+# Pick the noise pixels for a canvas.
+def sample_noise(canvas):
+    # Add noise to the image 80% of the time to make it more realistic.
+    if random.random() >= 0.8:
+        return np.empty((0, 2), dtype=np.int64)
+    x_min, x_max, y_min, y_max = canvas
+    xs = sorted((x_min, x_max))
+    ys = sorted((y_min, y_max))
+    total_pixels = abs((xs[1] - xs[0]) * (ys[1] - ys[0]))
+    noise_level = 0.002
+    nn = int(total_pixels * noise_level)
+    # The pixel batch comes from a generator seeded off the random module, so
+    # random.seed() reproduces the noise as well as the geometry.
+    rng = np.random.default_rng(random.getrandbits(64))
+    return np.column_stack([rng.integers(int(xs[0]), int(xs[1]), nn),
+                            rng.integers(int(ys[0]), int(ys[1]), nn)])
+
+# Draw every line segment, every oval and all noise pixels as one artist each.
+def draw_scene(ax, buf):
+    if len(buf.segments):
+        ax.add_collection(LineCollection(buf.segments, colors='k', linewidths=2, capstyle='projecting'))
+    if len(buf.oval_centers):
+        ax.add_collection(EllipseCollection(buf.oval_widths, buf.oval_heights, buf.oval_angles, units='xy',
+                                            offsets=buf.oval_centers, offset_transform=ax.transData,
+                                            edgecolors='k', facecolors='none', linewidths=2))
+    if len(buf.noise):
+        # One marker-only line draws every noise pixel in a single call.
+        ax.plot(buf.noise[:, 0], buf.noise[:, 1], 'ks', markersize=1, linestyle='none')
+
+# Render into the caller's (fig, ax) when given, e.g. when batching scenes onto
+# a figure the caller owns; otherwise into the shared off-screen figure. The
+# PNG is written by the figure's canvas directly.
+def render_scene(buf, canvas, image_out, fig=None, ax=None):
+    if ax is None:
+        fig, ax = get_scene_axes(canvas)
+    else:
+        # A lone ax is enough; its figure is the one that gets saved.
+        if fig is None:
+            fig = ax.figure
+        ax.cla()
+        setup_scene_axes(ax, canvas)
+    draw_scene(ax, buf)
+    fig.canvas.print_figure(image_out, dpi=120, bbox_inches='tight', pad_inches=0)
+    print(f"Scene image saved to {image_out}")
+
 def display_and_save_scene(scene, outdir="output", question=None, answer=None,
-                           canvas=(0, 100, 0, 100), huggingface_dataset=True, visualize=False):
+                           canvas=(0, 100, 0, 100), huggingface_dataset=True, visualize=False,
+                           fig=None, ax=None, render_image=True):
+    # With render_image=False only the question/answer text is written and the
+    # image is neither drawn nor saved (a shown scene is still drawn).
+    render_image = render_image or visualize
     # Determine output file/directory settings based on the dataset type.
     if huggingface_dataset:
         outdir = "output"
         image_folder = os.path.join(outdir, "images")
         os.makedirs(outdir, exist_ok=True)
-        os.makedirs(image_folder, exist_ok=True)
+        if render_image:
+            os.makedirs(image_folder, exist_ok=True)
         unique_id = uuid.uuid4().hex
         image_filename = f"scene_{unique_id}.png"
         image_out = os.path.join(image_folder, image_filename)
     else:
         os.makedirs(outdir, exist_ok=True)
         image_out = os.path.join(outdir, "scene.png")
-    
-    # Create figure and render the scene.
-    fig, ax = plt.subplots(figsize=(5, 5))
-    x_min, x_max, y_min, y_max = canvas
-    ax.set_xlim(x_min, x_max)
-    ax.set_ylim(y_min, y_max)
-    ax.invert_yaxis()
-    ax.set_aspect("equal")
-    ax.axis("off")
-    
-    for obj in scene:
-        obj.render(ax)
-    
-    # Add noise to the image 50% of the time to make it more realistic.
-    if random.random() < 0.8:
-        xs = sorted(ax.get_xlim())
-        ys = sorted(ax.get_ylim())
-        total_pixels = abs((xs[1] - xs[0]) * (ys[1] - ys[0]))
-        noise_level = 0.002
-        nn = int(total_pixels * noise_level)
-        for _ in range(nn):
-            xx = random.randint(int(xs[0]), int(xs[1]) - 1)
-            yy = random.randint(int(ys[0]), int(ys[1]) - 1)
-            ax.plot(xx, yy, 'ks', markersize=1)
-    
-    # If visualize flag is true, display the image with a title before saving.
-    if visualize:
-        title_text = ""
-        if question:
-            title_text += f"Question: {question}"
-        if answer is not None:
+
+    if render_image:
+        buf = SceneBuffer.from_scene(scene, noise=sample_noise(canvas))
+        if visualize:
+            # Showing the scene needs a GUI backend; switch before the figure is
+            # created. A shown figure gets its own window, so it is not shared.
+            if matplotlib.get_backend().lower() == "agg":
+                plt.switch_backend("TkAgg")
+            fig, ax = get_scene_axes(canvas, reuse=False)
+            draw_scene(ax, buf)
+            title_text = ""
+            if question:
+                title_text += f"Question: {question}"
+            if answer is not None:
+                if title_text:
+                    title_text += " | "
+                title_text += f"Answer: {answer}"
             if title_text:
-                title_text += " | "
-            title_text += f"Answer: {answer}"
-        if title_text:
-            ax.set_title(title_text)
-        plt.show()  # This call will block until the window is closed.
-    
-    # Save the scene image.
-    fig.savefig(image_out, dpi=120, bbox_inches='tight', pad_inches=0)
-    print(f"Scene image saved to {image_out}")
+                ax.set_title(title_text)
+            plt.show()  # This call will block until the window is closed.
+            fig.savefig(image_out, dpi=120, bbox_inches='tight', pad_inches=0)
+            print(f"Scene image saved to {image_out}")
+            plt.close(fig)
+        else:
+            render_scene(buf, canvas, image_out, fig=fig, ax=ax)
+
     def replace_first_value(s):
         if "True" in s:
             # Replace only the first instance of "True"
@@ -1101,15 +1278,15 @@ def display_and_save_scene(scene, outdir="output", question=None, answer=None,
             return s
     # Handle annotation saving based on the dataset type.
     if huggingface_dataset:
-        abs_image_path = os.path.abspath(image_out)
+        user_content = [{"type": "text", "content": question}]
+        if render_image:
+            abs_image_path = os.path.abspath(image_out)
+            user_content.insert(0, {"type": "image_path", "content": abs_image_path})
         conversation = {
             "messages": [
                 {
                     "role": "user",
-                    "content": [
-                        {"type": "image_path", "content": abs_image_path},
-                        {"type": "text", "content": question}
-                    ]
+                    "content": user_content
                 },
                 {
                     "role": "assistant",
@@ -1128,8 +1305,7 @@ def display_and_save_scene(scene, outdir="output", question=None, answer=None,
         with open(ann_out, "w") as ann_file:
             json.dump(annotation, ann_file, indent=2)
         print(f"Annotation saved to {ann_out}")
-    
-    plt.close(fig)
+
 
 ##############################################################################
 # Modified run_scene_demo: Integrates scene creation and display.
@@ -1347,6 +1523,11 @@ def demo_question_arrow_direction(answer=True, outdir="demo_output/question_arro
     question_text = f"Is there an arrow pointing {direction}?"
     display_and_save_scene(scene, outdir=outdir, question=question_text, answer=skill_output + "\n" + str(answer), canvas=canvas)
 
+# Unit-circle (cos, sin) table for the 36 samples per oval; the angles never
+# change, so there is no trig per call.
+_OVAL_UNIT = np.array([(math.cos(2 * math.pi * i / 36), math.sin(2 * math.pi * i / 36))
+                       for i in range(36)])
+
 # 4. Does a <shape 1> intersect with a <shape 2>?
 def demo_question_intersect_objects(answer=True,
                                     outdir="demo_output/question_intersect_objects",
@@ -1374,35 +1555,37 @@ def demo_question_intersect_objects(answer=True,
     # ------------------------
     # Helper: Generate random parameters for a shape.
     margin = 5
+    # Both helpers run inside the retry loops below; bind the sampler once.
+    uniform = random.uniform
     def gen_params(shape):
         if shape == "Line":
-            p1 = (random.uniform(margin, width - margin), random.uniform(margin, height - margin))
-            p2 = (random.uniform(margin, width - margin), random.uniform(margin, height - margin))
+            p1 = (uniform(margin, width - margin), uniform(margin, height - margin))
+            p2 = (uniform(margin, width - margin), uniform(margin, height - margin))
             return {"p1": p1, "p2": p2}
         elif shape in ["Oval", "Circle", "Rectangle", "Square"]:
-            center = (random.uniform(margin, width - margin), random.uniform(margin, height - margin))
-            w = random.uniform(10, width / 2)
-            h = random.uniform(10, height / 2)
+            center = (uniform(margin, width - margin), uniform(margin, height - margin))
+            w = uniform(10, width / 2)
+            h = uniform(10, height / 2)
             if shape in ["Circle", "Square"]:
                 h = w  # force equal dimensions
-            angle = random.uniform(0, 360)
+            angle = uniform(0, 360)
             return {"center": center, "width": w, "height": h, "angle": angle}
         elif shape == "Triangle":
             # Use a center point and generate three vertices with small random offsets.
-            center = (random.uniform(margin, width - margin), random.uniform(margin, height - margin))
+            center = (uniform(margin, width - margin), uniform(margin, height - margin))
             pts = []
             for _ in range(3):
-                pts.append((center[0] + random.uniform(-0.3 * width, 0.3 * width),
-                            center[1] + random.uniform(-0.3 * height, 0.3 * height)))
+                pts.append((center[0] + uniform(-0.3 * width, 0.3 * width),
+                            center[1] + uniform(-0.3 * height, 0.3 * height)))
             return {"vertices": pts}
         elif shape == "Polygon":
             # Generate a 5-vertex polygon by perturbing points around a circle.
-            center = (random.uniform(margin, width - margin), random.uniform(margin, height - margin))
+            center = (uniform(margin, width - margin), uniform(margin, height - margin))
             pts = []
             count = 5
             for i in range(count):
-                ang = 2 * math.pi * i / count + random.uniform(-0.2, 0.2)
-                r = random.uniform(10, 30)
+                ang = 2 * math.pi * i / count + uniform(-0.2, 0.2)
+                r = uniform(10, 30)
                 pts.append((center[0] + r * math.cos(ang),
                             center[1] + r * math.sin(ang)))
             return {"vertices": pts}
@@ -1412,19 +1595,19 @@ def demo_question_intersect_objects(answer=True,
     def wiggle_params(params, shape, delta=5, angle_delta=10):
         new_params = params.copy()
         if shape == "Line":
-            new_params["p1"] = (params["p1"][0] + random.uniform(-delta, delta),
-                                params["p1"][1] + random.uniform(-delta, delta))
-            new_params["p2"] = (params["p2"][0] + random.uniform(-delta, delta),
-                                params["p2"][1] + random.uniform(-delta, delta))
+            new_params["p1"] = (params["p1"][0] + uniform(-delta, delta),
+                                params["p1"][1] + uniform(-delta, delta))
+            new_params["p2"] = (params["p2"][0] + uniform(-delta, delta),
+                                params["p2"][1] + uniform(-delta, delta))
         elif shape in ["Oval", "Circle", "Rectangle", "Square"]:
-            new_params["center"] = (params["center"][0] + random.uniform(-delta, delta),
-                                    params["center"][1] + random.uniform(-delta, delta))
-            new_params["angle"] = (params["angle"] + random.uniform(-angle_delta, angle_delta)) % 360
+            new_params["center"] = (params["center"][0] + uniform(-delta, delta),
+                                    params["center"][1] + uniform(-delta, delta))
+            new_params["angle"] = (params["angle"] + uniform(-angle_delta, angle_delta)) % 360
         elif shape in ["Triangle", "Polygon"]:
             new_vertices = []
             for (x, y) in params["vertices"]:
-                new_vertices.append((x + random.uniform(-delta, delta),
-                                     y + random.uniform(-delta, delta)))
+                new_vertices.append((x + uniform(-delta, delta),
+                                     y + uniform(-delta, delta)))
             new_params["vertices"] = new_vertices
         return new_params
 
@@ -1534,33 +1717,32 @@ def demo_question_intersect_objects(answer=True,
     
     # --- Intersection: Oval-Oval.
     def doesOvalOvalIntersect(oval1, oval2):
-        def sample_oval(ov, count=36):
-            pts = []
+        def sample_oval(ov):
             cx, cy = ov.center
             w2, h2 = ov.width / 2.0, ov.height / 2.0
-            for i in range(count):
-                theta = 2 * math.pi * i / count
-                x = cx + w2 * math.cos(theta)
-                y = cy + h2 * math.sin(theta)
-                pts.append(_rotate_point((x, y), ov.center, ov.angle))
-            return pts
-        pts1 = sample_oval(oval1)
-        pts2 = sample_oval(oval2)
-        def point_in_oval(pt, ov):
+            rad = math.radians(ov.angle)
+            c, s = math.cos(rad), math.sin(rad)
+            # Rotate every sample about the center at once.
+            dx = w2 * _OVAL_UNIT[:, 0]
+            dy = h2 * _OVAL_UNIT[:, 1]
+            xs = cx + dx * c - dy * s
+            ys = cy + dx * s + dy * c
+            return np.column_stack([xs, ys])
+
+        # True if any point of the (N, 2) array pts lies inside the oval; the whole
+        # batch is tested with one array expression.
+        def any_point_in_oval(pts, ov):
             cx, cy = ov.center
             rad = math.radians(-ov.angle)
-            x, y = pt[0] - cx, pt[1] - cy
-            xr = x * math.cos(rad) - y * math.sin(rad)
-            yr = x * math.sin(rad) + y * math.cos(rad)
+            c, s = math.cos(rad), math.sin(rad)
             w2, h2 = ov.width/2.0, ov.height/2.0
-            return (xr**2)/(w2**2) + (yr**2)/(h2**2) <= 1.0
-        for pt in pts1:
-            if point_in_oval(pt, oval2):
-                return True
-        for pt in pts2:
-            if point_in_oval(pt, oval1):
-                return True
-        return False
+            x = pts[:, 0] - cx
+            y = pts[:, 1] - cy
+            xr = x * c - y * s
+            yr = x * s + y * c
+            return bool(((xr**2)/(w2**2) + (yr**2)/(h2**2) <= 1.0).any())
+        return (any_point_in_oval(sample_oval(oval1), oval2) or
+                any_point_in_oval(sample_oval(oval2), oval1))
     
     # --- Intersection: Polygon-Polygon.
     def doesPolyPolyIntersect(poly1, poly2):
@@ -1747,17 +1929,13 @@ def demo_question_intersect_objects(answer=True,
                 relevant_objs.append(("Oval", {"center": obj.center, "width": obj.width, "height": obj.height, "angle": obj.angle}))
             elif isinstance(obj, RectangleObj) and "Rectangle" in types:
                 # Treat as polygon
-                vs = []
-                for ln in obj.sub_references:
-                    vs.append(ln.p1)
+                vs = [ln.p1 for ln in obj._lines]
                 relevant_objs.append(("polygon", {"vertices": vs}))
             elif isinstance(obj, TriangleObj) and "Triangle" in types:
                 relevant_objs.append(("polygon", {"vertices": obj.vertices}))
             elif isinstance(obj, PolygonObj) and "Polygon" in types:
                 # Build polygon vertices from line sub-refs
-                vs = []
-                for ln in obj.sub_references[:obj.sides]:
-                    vs.append(ln.p1)
+                vs = [ln.p1 for ln in obj._lines[:obj.sides]]
                 relevant_objs.append(("polygon", {"vertices": vs}))
 
         any_intersect = False
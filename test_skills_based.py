@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from skills_based import AxisObj, BarGraphObj, BarsObj
+
+
+class MoveTest(unittest.TestCase):
+
+    def assertPointAlmostEqual(self, p, q):
+        self.assertAlmostEqual(p[0], q[0])
+        self.assertAlmostEqual(p[1], q[1])
+
+    # Moving a bar graph twice keeps its axes, bars and bbox together and
+    # leaves the sampled shape as it was.
+    def test_bar_graph_moved_twice(self):
+        random.seed(0)
+        graph = BarGraphObj(base_position=(10, 50), bars_angle=0)
+        graph.assign_geometry()
+        x1, y1, x2, y2 = graph.get_bbox()
+        heights = [rect.height for rect in graph.bars_obj.bars_list]
+        ticks = len(graph.axis_obj_x.ticks)
+        for target in [(20, 60), (35, 40)]:
+            graph.set_bottom_left(*target, angle=0,
+                                  axis_length=graph.axis_length,
+                                  bars_num=graph.bars_num)
+            graph.assign_geometry()
+            self.assertPointAlmostEqual(graph.base_position, target)
+            self.assertPointAlmostEqual(graph.bars_obj.base_position, target)
+            for axis in [graph.axis_obj_x, graph.axis_obj_y]:
+                self.assertPointAlmostEqual(axis.start_position, target)
+                self.assertPointAlmostEqual(axis.p1, target)
+        dx, dy = 25, -10
+        for got, want in zip(graph.get_bbox(), (x1 + dx, y1 + dy, x2 + dx, y2 + dy)):
+            self.assertAlmostEqual(got, want)
+        self.assertEqual([rect.height for rect in graph.bars_obj.bars_list], heights)
+        self.assertEqual(len(graph.axis_obj_x.ticks), ticks)
+
+    # A moved axis with a random start keeps its new start when it is later
+    # regenerated (e.g. unlocked by a parent bar graph).
+    def test_axis_move_survives_regeneration(self):
+        random.seed(0)
+        axis = AxisObj()
+        axis.assign_geometry()
+        axis.set_bottom_left(5, 5, angle=axis.axis_angle, axis_length=axis.axis_length)
+        axis.assign_geometry()
+        self.assertPointAlmostEqual(axis.p1, (5, 5))
+        axis._geometry_locked = False
+        axis.assign_geometry()
+        self.assertPointAlmostEqual(axis.p1, (5, 5))
+
+    # A list base position (as loaded from a JSON plan) is moved, not stacked.
+    def test_bars_list_position_moved_twice(self):
+        random.seed(0)
+        bars = BarsObj(base_position=[10, 50])
+        bars.assign_geometry()
+        for _ in range(2):
+            bars.set_bottom_left(60, 60, angle=bars.angle)
+            bars.assign_geometry()
+        self.assertEqual(bars.base_position, (60, 60))
+        first = bars.bars_list[0]
+        self.assertPointAlmostEqual(first._lines[0].p1, (60, 60))
+
+
+if __name__ == "__main__":
+    unittest.main()